@@ -1,38 +1,54 @@
-from os.path import join as pjoin, splitext, isdir
+from os.path import join as pjoin, split
 from argparse import ArgumentParser
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 try:
-    from embedder import read_woff_properties, generate_css
+    from embedder import build_css_from_bytes
 except ImportError:
-    from .embedder import read_woff_properties, generate_css
-from os import walk, mkdir
+    from .embedder import build_css_from_bytes
+from os import scandir, makedirs, cpu_count
 
 
-def generate_batch(directory: str, loud=True):
-    for dirname in ('combined', 'single'):
-        if not isdir(dirname):
-            mkdir(dirname)
-    families = {}
-
-    for path, dirs, files in walk(directory):
-        for file in files:
-            if splitext(file)[-1] != '.woff':
-                continue
-            filepath = pjoin(path, file)
-            try:
-                woff_props = read_woff_properties(filepath)
-                full_name = woff_props['name']['Full']
-                dest_path = pjoin('single', f'{full_name}.css')
+def _iter_woff(root: str):
+    # scandir reuses the type information the directory listing already
+    # fetched, so this avoids the extra stat calls os.walk would make
+    with scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_woff(entry.path)
+            elif entry.name.endswith('.woff'):
+                yield entry.path
 
-                css = generate_css(filepath)
-                font_family = css.split('\n')[1][14:-1]
-                if font_family in families:
-                    families[font_family].append(css)
-                else:
-                    families[font_family] = [css]
 
-                with open(dest_path, 'w', encoding='utf-8') as css_file:
-                    css_file.write(css)
+def _process_one(filepath: str):
+    # read the file once and feed the same buffer to both the property
+    # parse and the base64 encode
+    with open(filepath, 'rb') as file:
+        buf = file.read()
+    return build_css_from_bytes(buf, name=split(filepath)[-1])
 
+
+def generate_batch(directory: str, loud=True):
+    makedirs('combined', exist_ok=True)
+    makedirs('single', exist_ok=True)
+
+    filepaths = list(_iter_woff(directory))
+
+    # worker threads read the next files from disk while others are busy
+    # base64-encoding or decompressing (both of which release the GIL),
+    # and the results stay in-process so nothing is pickled between
+    # workers and the writing loops below
+    results = []
+    with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
+        futures = {executor.submit(_process_one, filepath): filepath
+                   for filepath in filepaths}
+        for future in as_completed(futures):
+            file = split(futures[future])[-1]
+            try:
+                full_name, font_family, css = future.result()
+                # encode once, so neither the single nor the combined
+                # write goes through the text layer's codec machinery
+                results.append((full_name, font_family, css.encode('utf-8')))
             except Exception as error:
                 if loud:
                     print(f'Error with {file}: {error}')
@@ -40,10 +56,18 @@ def generate_batch(directory: str, loud=True):
             if loud:
                 print(f'Done: {file}')
 
+    # with all the results in hand, each output directory is written in
+    # one tight pass instead of interleaving writes with the processing
+    families = defaultdict(list)
+    for full_name, font_family, data in results:
+        with open(pjoin('single', f'{full_name}.css'), 'wb') as css_file:
+            css_file.write(data)
+        families[font_family].append(data)
+
     for family in families:
         dest_path = pjoin('combined', f'{family}.css')
-        with open(dest_path, 'w', encoding='utf-8') as file:
-            file.write('\n'.join(families[family]))
+        with open(dest_path, 'wb') as file:
+            file.write(b'\n'.join(families[family]))
         if loud:
             print('Wrote family', family)
 
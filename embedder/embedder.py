@@ -1,325 +1,319 @@
 from argparse import ArgumentParser
-from typing import Tuple, Dict, Union, List
-from struct import unpack
+from typing import Tuple, Dict, Union
+from struct import Struct
+from os import stat
 from os.path import split
 from zlib import decompress
-from io import BytesIO
-from base64 import encodebytes
+from base64 import b64encode
 
 
 class FileFormatError(Exception):
     pass
 
 
+# precompiled struct formats, so that the format strings are only
+# parsed once instead of on every unpack call
+# the WOFF header and table directory entries, as laid out in
+# https://www.w3.org/TR/WOFF/
+_HDR = Struct('>IIIHHIHHIIIII')
+_HDR_KEYS = (
+    "signature", "flavor", "length", "numTables", "reserved",
+    "totalSfntSize", "majorVersion", "minorVersion", "metaOffset",
+    "metaLength", "metaOrigLength", "privOffset", "privLength"
+)
+_TBL = Struct('>4sIIII')
+# the name table header and name records
+_NAME_HDR = Struct('>HHH')
+_NAME_REC = Struct('>HHHHHH')
+# the OS/2 table, one struct per version; each version only appends
+# fields to the previous one, so the formats share a common prefix
+# the first five fields are identical in every version, and are all
+# that CSS generation actually needs
+_OS2_MIN = Struct('>HhHHH')
+_OS2_FMT_V0 = '>HhHHHhhhhhhhhhhh10bIIII4sHHHhhhHH'
+_OS2_STRUCTS = {
+    0: Struct(_OS2_FMT_V0),
+    1: Struct(_OS2_FMT_V0 + 'II'),
+    2: Struct(_OS2_FMT_V0 + 'IIhhHHH'),
+    3: Struct(_OS2_FMT_V0 + 'IIhhHHH'),
+    4: Struct(_OS2_FMT_V0 + 'IIhhHHH'),
+    5: Struct(_OS2_FMT_V0 + 'IIhhHHHHH')
+}
+_OS2_PRE_KEYS = (
+    "version", "xAvgCharWidth", "usWeightClass", "usWidthClass", "fsType",
+    "ySubscriptXSize", "ySubscriptYSize", "ySubscriptXOffset",
+    "ySubscriptYOffset", "ySuperscriptXSize", "ySuperscriptYSize",
+    "ySuperscriptXOffset", "ySuperscriptYOffset", "yStrikeoutSize",
+    "yStrikeoutPosition", "sFamilyClass"
+)
+_OS2_POST_KEYS = (
+    "ulUnicodeRange1", "ulUnicodeRange2", "ulUnicodeRange3",
+    "ulUnicodeRange4", "achVendID", "fsSelection", "usFirstCharIndex",
+    "usLastCharIndex", "sTypoAscender", "sTypoDescender", "sTypoLineGap",
+    "usWinAscent", "usWinDescent", "ulCodePageRange1", "ulCodePageRange2",
+    "sxHeight", "sCapHeight", "usDefaultChar", "usBreakChar",
+    "usMaxContext", "usLowerOpticalPointSize", "usUpperOpticalPointSize"
+)
+
+
 def read_woff_properties(filepath: str) -> Dict[str, Dict[str, Union[str, int]]]:
+    # one whole-file read is much cheaper than the dozens of tiny reads
+    # the parser used to issue through the buffered file layer
+    with open(filepath, 'rb') as file:
+        buf = file.read()
+    return read_woff_properties_from_bytes(buf, split(filepath)[-1])
+
+
+def read_woff_properties_from_bytes(buf: bytes, filename: str = '<mem>') -> Dict[str, Dict[str, Union[str, int]]]:
     # the specifications for the WOFF format are here:
     # https://www.w3.org/TR/WOFF/
     # naming conventions are adopted from this document,
     # despite not being particularly pythonic
 
-    with open(filepath, 'rb') as file:
-        filename = split(filepath)[-1]
-        header_dict = {
-            "signature": unpack('>I', file.read(4))[0],
-            "flavor": unpack('>I', file.read(4))[0],
-            "length": unpack('>I', file.read(4))[0],
-            "numTables": unpack('>H', file.read(2))[0],
-            "reserved": unpack('>H', file.read(2))[0],
-            "totalSfntSize": unpack('>I', file.read(4))[0],
-            "majorVersion": unpack('>H', file.read(2))[0],
-            "minorVersion": unpack('>H', file.read(2))[0],
-            "metaOffset": unpack('>I', file.read(4))[0],
-            "metaLength": unpack('>I', file.read(4))[0],
-            "metaOrigLength": unpack('>I', file.read(4))[0],
-            "privOffset": unpack('>I', file.read(4))[0],
-            "privLength": unpack('>I', file.read(4))[0]
-        }
-
-        # there's a whole lot of stuff that can be done
-        # to ensure that the WOFF is valid, but if it passes
-        # all three of these checks, it's probably good enough
-        # (unless it starts throwing other errors)
-        if header_dict['signature'] != 2001684038:
-            raise FileFormatError(f'File {filename} does not seem to be a valid WOFF file (signature: {header_dict["signature"]})')
-        if header_dict['majorVersion'] != 1:
-            raise FileFormatError(f'File {filename} is a WOFF version {header_dict["majorVersion"]}, which is not supported')
-        if header_dict['totalSfntSize'] % 4 != 0:
-            raise FileFormatError(f'File {filename} has an invalid size, indicating that it is not a valid WOFF file')
-
-        # this bit finds tables with useful information and turns them into bytes strings
-        # sometimes they need to be decompressed, luckily zlib is in the standard library
-        table_headers = {k: None for k in ['name', 'os/2']}
-        tables = {}
-        for table_index in range(header_dict['numTables']):
-            table_data = {
-                "tag": file.read(4).decode('ascii'),
-                "offset": unpack('>I', file.read(4))[0],
-                "compLength": unpack('>I', file.read(4))[0],
-                "origLength": unpack('>I', file.read(4))[0],
-                "origChecksum": unpack('>I', file.read(4))[0]
+    header_dict = dict(zip(_HDR_KEYS, _HDR.unpack_from(buf)))
+
+    # there's a whole lot of stuff that can be done
+    # to ensure that the WOFF is valid, but if it passes
+    # all three of these checks, it's probably good enough
+    # (unless it starts throwing other errors)
+    if header_dict['signature'] != 2001684038:
+        raise FileFormatError(f'File {filename} does not seem to be a valid WOFF file (signature: {header_dict["signature"]})')
+    if header_dict['majorVersion'] != 1:
+        raise FileFormatError(f'File {filename} is a WOFF version {header_dict["majorVersion"]}, which is not supported')
+    if header_dict['totalSfntSize'] % 4 != 0:
+        raise FileFormatError(f'File {filename} has an invalid size, indicating that it is not a valid WOFF file')
+
+    # this bit finds tables with useful information and turns them into bytes strings
+    # sometimes they need to be decompressed, luckily zlib is in the standard library
+    table_headers = {k: None for k in ['name', 'os/2']}
+    tables = {}
+    directory_end = _HDR.size + _TBL.size * header_dict['numTables']
+    for tag, offset, comp_length, orig_length, orig_checksum in _TBL.iter_unpack(buf[_HDR.size:directory_end]):
+        tag = tag.decode('ascii').lower()
+        if tag in table_headers:
+            table_headers[tag] = {
+                "tag": tag,
+                "offset": offset,
+                "compLength": comp_length,
+                "origLength": orig_length,
+                "origChecksum": orig_checksum
             }
-            tag = table_data['tag'].lower()
-            if tag in table_headers:
-                table_headers[tag] = table_data
-        for table_name in table_headers:
-            if table_headers[table_name] is None:
-                raise FileFormatError(f'File {filename} does not seem to have an internal {table_name} table')
-            is_compressed = table_headers[table_name]['compLength'] != table_headers[table_name]['origLength']
-            file.seek(table_headers[table_name]['offset'])
-            table_data = file.read(table_headers[table_name]['compLength'])
-            if is_compressed:
-                table_data = decompress(table_data)
-                # the specification allows for leading null bytes, in order to make the file match 4-byte-block format
-                # but, this can be too much: you can end up stripping important null bytes later on
-                # there used to be some code that stripped leading null bytes, but it turns out that that's a terrible
-                # idea and it causes many problems
-            # need to parse the data before it can be used
-            if table_name == 'os/2':
-                tables[table_name] = parse_os2_table(table_data)
-            elif table_name == 'name':
-                tables[table_name] = parse_name_table(table_data)
-            else:
-                tables[table_name] = table_data
+    # slicing a memoryview is zero-copy, so compressed payloads go
+    # straight into decompress without an intermediate bytes object
+    view = memoryview(buf)
+    for table_name in table_headers:
+        if table_headers[table_name] is None:
+            raise FileFormatError(f'File {filename} does not seem to have an internal {table_name} table')
+        is_compressed = table_headers[table_name]['compLength'] != table_headers[table_name]['origLength']
+        offset = table_headers[table_name]['offset']
+        raw = view[offset:offset + table_headers[table_name]['compLength']]
+        if is_compressed:
+            table_data = decompress(raw)
+            # the specification allows for leading null bytes, in order to make the file match 4-byte-block format
+            # but, this can be too much: you can end up stripping important null bytes later on
+            # there used to be some code that stripped leading null bytes, but it turns out that that's a terrible
+            # idea and it causes many problems
+        else:
+            table_data = bytes(raw)
+        # need to parse the data before it can be used
+        if table_name == 'os/2':
+            tables[table_name] = parse_os2_table(table_data)
+        elif table_name == 'name':
+            tables[table_name] = parse_name_table(table_data)
+        else:
+            tables[table_name] = table_data
 
     return tables
 
 
 def parse_name_table(data: bytes) -> Dict[str, Union[str, int]]:
-    buffer = BytesIO(data)
-
-    format_selector = unpack('>H', buffer.read(2))[0]
+    format_selector, count, string_offset = _NAME_HDR.unpack_from(data)
 
     if format_selector not in [0, 1]:
         raise FileFormatError(f'A name table of format {format_selector} was found, which is invalid')
 
-    naming_table = {
-        "format": format_selector,
-        "count": unpack('>H', buffer.read(2))[0],
-        "stringOffset": unpack('>H', buffer.read(2))[0]
-    }
-    name_ids = {
-        0: "Copyright",
-        1: "Family",
-        2: "Subfamily",
-        3: "Identifier",
-        4: "Full",
-        5: "Version",
-        6: "PostScript",
-        7: "Trademark",
-        8: "Manufacturer",
-        9: "Designer",
-        10: "Description",
-        11: "URL",
-        12: "URL",
-        13: "License",
-        14: "License",
-        15: "Reserved",
-        16: "Typographic",
-        17: "Typographic",
-        18: "Compatible",
-        19: "Sample",
-        20: "PostScript",
-        21: "WWS",
-        22: "WWS",
-        23: "Light",
-        24: "Dark",
-        25: "Variations"
-    }
-
-    name_record_positions: List[Tuple[int, int, int]] = []
-    for name_record_index in range(naming_table['count']):
-        platform_id = unpack('>H', buffer.read(2))[0]
-        encoding_id = unpack('>H', buffer.read(2))[0]
-        language_id = unpack('>H', buffer.read(2))[0]
-        name_id = unpack('>H', buffer.read(2))[0]
-        length = unpack('>H', buffer.read(2))[0]
-        offset = unpack('>H', buffer.read(2))[0]
-        name_record_positions.append((name_id, offset, length))
-
+    # the data is already in memory, so the records and strings are
+    # addressed directly by offset instead of seeking through a BytesIO
     name_records = {}
-    for name_id, offset, length in name_record_positions:
-        buffer.seek(naming_table['stringOffset'] + offset)
-        value = buffer.read(length)
-        text = value.decode('utf-16-be').replace(b'\x00'.decode('utf-8'), '')
+    for record_index in range(count):
+        platform_id, encoding_id, language_id, name_id, length, offset = \
+            _NAME_REC.unpack_from(data, _NAME_HDR.size + record_index * _NAME_REC.size)
+        start = string_offset + offset
+        value = data[start:start + length]
+        # almost every name string is plain ASCII stored as UTF-16-BE,
+        # i.e. every high byte is zero; in that case the low bytes can be
+        # decoded directly, skipping the decode-then-strip-nulls dance
+        if not any(value[0::2]):
+            text = value[1::2].decode('latin-1')
+        else:
+            text = value.decode('utf-16-be').replace('\x00', '')
         try:
-            name_records[name_ids[name_id]] = text
+            name_records[_NAME_IDS[name_id]] = text
         except KeyError:
             continue
 
     return name_records
 
 
-def parse_os2_table(data: bytes) -> Dict[str, Union[str, int]]:
-    buffer = BytesIO(data)
-
-    version = unpack('>H', buffer.read(2))[0]
+def parse_os2_table(data: bytes, full: bool = False) -> Dict[str, Union[str, int]]:
+    # a one-off scalar read: int.from_bytes is a C builtin with no
+    # format string to interpret and no 1-tuple to allocate
+    version = int.from_bytes(data[:2], 'big')
 
     # oof
     # https://docs.microsoft.com/en-us/typography/opentype/spec/os2#os2-table-and-opentype-font-variations
-    if version == 5:
-        return {
-            "version": version,
-            "xAvgCharWidth": unpack('>h', buffer.read(2))[0],
-            "usWeightClass": unpack('>H', buffer.read(2))[0],
-            "usWidthClass": unpack('>H', buffer.read(2))[0],
-            "fsType": unpack('>H', buffer.read(2))[0],
-            "ySubscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutSize": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutPosition": unpack('>h', buffer.read(2))[0],
-            "sFamilyClass": unpack('>h', buffer.read(2))[0],
-            "panose": [unpack('>b', buffer.read(1))[0] for i in range(10)],
-            "ulUnicodeRange1": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange2": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange3": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange4": unpack('>I', buffer.read(4))[0],
-            "achVendID": buffer.read(4).decode('ascii'),
-            "fsSelection": unpack('>H', buffer.read(2))[0],
-            "usFirstCharIndex": unpack('>H', buffer.read(2))[0],
-            "usLastCharIndex": unpack('>H', buffer.read(2))[0],
-            "sTypoAscender": unpack('>h', buffer.read(2))[0],
-            "sTypoDescender": unpack('>h', buffer.read(2))[0],
-            "sTypoLineGap": unpack('>h', buffer.read(2))[0],
-            "usWinAscent": unpack('>H', buffer.read(2))[0],
-            "usWinDescent": unpack('>H', buffer.read(2))[0],
-            "ulCodePageRange1": unpack('>I', buffer.read(4))[0],
-            "ulCodePageRange2": unpack('>I', buffer.read(4))[0],
-            "sxHeight": unpack('>h', buffer.read(2))[0],
-            "sCapHeight": unpack('>h', buffer.read(2))[0],
-            "usDefaultChar": unpack('>H', buffer.read(2))[0],
-            "usBreakChar": unpack('>H', buffer.read(2))[0],
-            "usMaxContext": unpack('>H', buffer.read(2))[0],
-            "usLowerOpticalPointSize": unpack('>H', buffer.read(2))[0],
-            "usUpperOpticalPointSize": unpack('>H', buffer.read(2))[0]
-        }
-    elif version in [2, 3, 4]:
-        return {
-            "version": version,
-            "xAvgCharWidth": unpack('>h', buffer.read(2))[0],
-            "usWeightClass": unpack('>H', buffer.read(2))[0],
-            "usWidthClass": unpack('>H', buffer.read(2))[0],
-            "fsType": unpack('>H', buffer.read(2))[0],
-            "ySubscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutSize": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutPosition": unpack('>h', buffer.read(2))[0],
-            "sFamilyClass": unpack('>h', buffer.read(2))[0],
-            "panose": [unpack('>b', buffer.read(1))[0] for i in range(10)],
-            "ulUnicodeRange1": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange2": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange3": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange4": unpack('>I', buffer.read(4))[0],
-            "achVendID": buffer.read(4).decode('ascii'),
-            "fsSelection": unpack('>H', buffer.read(2))[0],
-            "usFirstCharIndex": unpack('>H', buffer.read(2))[0],
-            "usLastCharIndex": unpack('>H', buffer.read(2))[0],
-            "sTypoAscender": unpack('>h', buffer.read(2))[0],
-            "sTypoDescender": unpack('>h', buffer.read(2))[0],
-            "sTypoLineGap": unpack('>h', buffer.read(2))[0],
-            "usWinAscent": unpack('>H', buffer.read(2))[0],
-            "usWinDescent": unpack('>H', buffer.read(2))[0],
-            "ulCodePageRange1": unpack('>I', buffer.read(4))[0],
-            "ulCodePageRange2": unpack('>I', buffer.read(4))[0],
-            "sxHeight": unpack('>h', buffer.read(2))[0],
-            "sCapHeight": unpack('>h', buffer.read(2))[0],
-            "usDefaultChar": unpack('>H', buffer.read(2))[0],
-            "usBreakChar": unpack('>H', buffer.read(2))[0],
-            "usMaxContext": unpack('>H', buffer.read(2))[0]
-        }
-    elif version == 1:
-        return {
-            "version": version,
-            "xAvgCharWidth": unpack('>h', buffer.read(2))[0],
-            "usWeightClass": unpack('>H', buffer.read(2))[0],
-            "usWidthClass": unpack('>H', buffer.read(2))[0],
-            "fsType": unpack('>H', buffer.read(2))[0],
-            "ySubscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutSize": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutPosition": unpack('>h', buffer.read(2))[0],
-            "sFamilyClass": unpack('>h', buffer.read(2))[0],
-            "panose": [unpack('>b', buffer.read(1))[0] for i in range(10)],
-            "ulUnicodeRange1": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange2": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange3": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange4": unpack('>I', buffer.read(4))[0],
-            "achVendID": buffer.read(4).decode('ascii'),
-            "fsSelection": unpack('>H', buffer.read(2))[0],
-            "usFirstCharIndex": unpack('>H', buffer.read(2))[0],
-            "usLastCharIndex": unpack('>H', buffer.read(2))[0],
-            "sTypoAscender": unpack('>h', buffer.read(2))[0],
-            "sTypoDescender": unpack('>h', buffer.read(2))[0],
-            "sTypoLineGap": unpack('>h', buffer.read(2))[0],
-            "usWinAscent": unpack('>H', buffer.read(2))[0],
-            "usWinDescent": unpack('>H', buffer.read(2))[0],
-            "ulCodePageRange1": unpack('>I', buffer.read(4))[0],
-            "ulCodePageRange2": unpack('>I', buffer.read(4))[0]
-        }
-    elif version == 0:
+    if version not in _OS2_STRUCTS:
+        raise FileFormatError(f'An OS/2 table of version {version} was found, which is invalid')
+
+    if not full:
+        # only unpack the handful of fields CSS generation cares about,
+        # instead of materializing a 30+ entry dict per font
+        version, _, weight_class, width_class, fs_type = _OS2_MIN.unpack_from(data)
         return {
             "version": version,
-            "xAvgCharWidth": unpack('>h', buffer.read(2))[0],
-            "usWeightClass": unpack('>H', buffer.read(2))[0],
-            "usWidthClass": unpack('>H', buffer.read(2))[0],
-            "fsType": unpack('>H', buffer.read(2))[0],
-            "ySubscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySubscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySubscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYSize": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptXOffset": unpack('>h', buffer.read(2))[0],
-            "ySuperscriptYOffset": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutSize": unpack('>h', buffer.read(2))[0],
-            "yStrikeoutPosition": unpack('>h', buffer.read(2))[0],
-            "sFamilyClass": unpack('>h', buffer.read(2))[0],
-            "panose": [unpack('>b', buffer.read(1))[0] for i in range(10)],
-            "ulUnicodeRange1": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange2": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange3": unpack('>I', buffer.read(4))[0],
-            "ulUnicodeRange4": unpack('>I', buffer.read(4))[0],
-            "achVendID": buffer.read(4).decode('ascii'),
-            "fsSelection": unpack('>H', buffer.read(2))[0],
-            "usFirstCharIndex": unpack('>H', buffer.read(2))[0],
-            "usLastCharIndex": unpack('>H', buffer.read(2))[0],
-            "sTypoAscender": unpack('>h', buffer.read(2))[0],
-            "sTypoDescender": unpack('>h', buffer.read(2))[0],
-            "sTypoLineGap": unpack('>h', buffer.read(2))[0],
-            "usWinAscent": unpack('>H', buffer.read(2))[0],
-            "usWinDescent": unpack('>H', buffer.read(2))[0]
+            "usWeightClass": weight_class,
+            "usWidthClass": width_class,
+            "fsType": fs_type
         }
-    else:
-        raise FileFormatError(f'An OS/2 table of version {version} was found, which is invalid')
+
+    values = _OS2_STRUCTS[version].unpack_from(data)
+    # the panose classification sits in the middle of the table as ten
+    # signed bytes, so the flat tuple is reassembled around it
+    table = dict(zip(_OS2_PRE_KEYS, values))
+    table['panose'] = list(values[16:26])
+    table.update(zip(_OS2_POST_KEYS, values[26:]))
+    table['achVendID'] = table['achVendID'].decode('ascii')
+    return table
 
 
 def generate_data_uri(filepath: str) -> str:
     with open(filepath, 'rb') as file:
-        encoded_bytes = encodebytes(file.read())
-    data = encoded_bytes.decode('utf-8').replace('\n', '')
-    data = f'data:font/woff;charset=utf-8;base64,{data}'
-    return data
+        return generate_data_uri_from_bytes(file.read())
+
+
+def generate_data_uri_from_bytes(buf: bytes) -> str:
+    # b64encode inserts no newlines, so the payload only has to be
+    # encoded and decoded once, with no replace() pass over the result
+    return f"data:font/woff;charset=utf-8;base64,{b64encode(buf).decode('ascii')}"
+
+
+# name IDs from the OpenType name table specification:
+# https://docs.microsoft.com/en-us/typography/opentype/spec/name#name-ids
+_NAME_IDS = {
+    0: "Copyright",
+    1: "Family",
+    2: "Subfamily",
+    3: "Identifier",
+    4: "Full",
+    5: "Version",
+    6: "PostScript",
+    7: "Trademark",
+    8: "Manufacturer",
+    9: "Designer",
+    10: "Description",
+    11: "URL",
+    12: "URL",
+    13: "License",
+    14: "License",
+    15: "Reserved",
+    16: "Typographic",
+    17: "Typographic",
+    18: "Compatible",
+    19: "Sample",
+    20: "PostScript",
+    21: "WWS",
+    22: "WWS",
+    23: "Light",
+    24: "Dark",
+    25: "Variations"
+}
+
+# the CSS font-stretch keyword for each OS/2 usWidthClass value
+_WIDTH_CLASSES = {
+    1: "ultra-condensed",
+    2: "extra-condensed",
+    3: "condensed",
+    4: "semi-condensed",
+    5: "normal",
+    6: "semi-expanded",
+    7: "expanded",
+    8: "extra-expanded",
+    9: "ultra-expanded"
+}
+
+# weight words that get stripped off the end of family names,
+# lowercased for the membership test
+_WEIGHT_WORDS = frozenset({
+    'thin', 'extralight', 'light', 'bold', 'semibold',
+    'black', 'medium', 'hairline', 'extrabold', 'regular'
+})
+
+# one (property, formatter) pair per emitted line, in output order;
+# this replaces an if/elif chain that re-compared the property names
+_CSS_EMITTERS = [
+    ('family', lambda v: f"font-family: {v}"),
+    ('copyright', lambda v: f"/*Copyright: {v}*/"),
+    ('license', lambda v: f"/*License: {v}*/"),
+    ('subfamily', lambda v: f"font-style: {'italic' if 'italic' in v.lower() else 'normal'}"),
+    ('weight', lambda v: f"font-weight: {v}"),
+    ('width', lambda v: f"font-stretch: {v}"),
+    ('src', lambda v: f"src: url(\"{v}\") format(\"woff\")")
+]
+
+
+def _font_family(family_name: str) -> str:
+    # the family name sometimes includes the weight (e.g. 'Oswald Light'),
+    # which would fragment a family across several font-family values
+    parts = family_name.split(' ')
+    while parts and parts[-1].lower() in _WEIGHT_WORDS:
+        parts.pop()
+    return ' '.join(parts)
+
+
+# generated CSS memoized against the file's identity on disk, so that
+# re-runs over mostly-unchanged directories skip the parse and encode
+_CSS_CACHE: Dict[Tuple[str, int, int], str] = {}
+
+
+def generate_css(filepath: str, props: Dict[str, Dict[str, Union[str, int]]] = None) -> str:
+    cache_key = None
+    if props is None:
+        file_stat = stat(filepath)
+        cache_key = (filepath, file_stat.st_mtime_ns, file_stat.st_size)
+        if cache_key in _CSS_CACHE:
+            return _CSS_CACHE[cache_key]
+
+    # the file bytes feed both the property parse and the data URI, so
+    # they are read exactly once
+    with open(filepath, 'rb') as file:
+        buf = file.read()
+    # callers that already parsed the file can pass the properties in
+    # rather than paying for a second parse
+    if props is None:
+        props = read_woff_properties_from_bytes(buf, split(filepath)[-1])
+    css = _css_from_properties(props, generate_data_uri_from_bytes(buf))
+    if cache_key is not None:
+        _CSS_CACHE[cache_key] = css
+    return css
+
+
+def generate_css_from_bytes(buf: bytes, name: str = '<mem>') -> str:
+    # the in-memory counterpart of generate_css, for callers (HTTP
+    # handlers, caching layers) that never touch the filesystem
+    props = read_woff_properties_from_bytes(buf, name)
+    return _css_from_properties(props, generate_data_uri_from_bytes(buf))
+
+
+def build_css_from_bytes(buf: bytes, name: str = '<mem>') -> Tuple[str, str, str]:
+    # one-stop shop for batch pipelines that already hold the file in
+    # memory: parse and encode the same buffer, and hand back the names
+    # needed to file the result without reparsing anything
+    props = read_woff_properties_from_bytes(buf, name)
+    css = _css_from_properties(props, generate_data_uri_from_bytes(buf))
+    return props['name']['Full'], _font_family(props['name']['Family']), css
 
 
-def generate_css(filepath: str) -> str:
-    woff_properties = read_woff_properties(filepath)
+def _css_from_properties(woff_properties: Dict[str, Dict[str, Union[str, int]]], data_uri: str) -> str:
     try:
         fs_type = woff_properties['os/2']['fsType']
         if fs_type != 0:
@@ -331,57 +325,23 @@ def generate_css(filepath: str) -> str:
         pass
 
     css_properties = {}
-    width_classes = {
-        1: "ultra-condensed",
-        2: "extra-condensed",
-        3: "condensed",
-        4: "semi-condensed",
-        5: "normal",
-        6: "semi-expanded",
-        7: "expanded",
-        8: "extra-expanded",
-        9: "ultra-expanded"
-    }
-    weight_words = [w.lower() for w in
-                    ('Thin', 'ExtraLight', 'Light', 'Bold', 'SemiBold',
-                     'Black', 'Medium', 'Hairline', 'ExtraBold', 'Regular')]
-
-    font_family = woff_properties['name']['Family']
-    font_family = font_family.split(' ')
-    while font_family[-1].lower() in weight_words:
-        font_family.pop(-1)
-    css_properties['family'] = ' '.join(font_family)
+    css_properties['family'] = _font_family(woff_properties['name']['Family'])
 
     css_properties['copyright'] = woff_properties['name']['Copyright']
     css_properties['license'] = woff_properties['name']['License']
 
     css_properties['subfamily'] = woff_properties['name']['Subfamily']
     css_properties['weight'] = woff_properties['os/2']['usWeightClass']
-    css_properties['width'] = width_classes[woff_properties['os/2']['usWidthClass']]
-    css_properties['src'] = generate_data_uri(filepath)
-
-    css = '@font-face {'
-    for property_name in css_properties:
-        if property_name == 'copyright':
-            new_line = f"/*Copyright: {css_properties['copyright']}*/"
-        elif property_name == 'license':
-            new_line = f"/*License: {css_properties['license']}*/"
-        elif property_name == 'src':
-            new_line = f"src: url(\"{css_properties['src']}\") format(\"woff\")"
-        elif property_name == 'family':
-            new_line = f"font-family: {css_properties['family']}"
-        elif property_name == 'subfamily':
-            new_line = f"font-style: {'italic' if 'italic' in css_properties['subfamily'].lower() else 'normal'}"
-        elif property_name == 'weight':
-            new_line = f"font-weight: {css_properties['weight']}"
-        elif property_name == 'width':
-            new_line = f"font-stretch: {css_properties['width']}"
-        else:
-            continue
-        css += '\n\t' + new_line + ';'
-    css += '\n}\n'
+    css_properties['width'] = _WIDTH_CLASSES[woff_properties['os/2']['usWidthClass']]
+    css_properties['src'] = data_uri
 
-    return css
+    # collect the lines and join once at the end, rather than growing
+    # the (data-URI-sized) string with repeated concatenation
+    lines = ['@font-face {']
+    for property_name, emit in _CSS_EMITTERS:
+        lines.append('\t' + emit(css_properties[property_name]) + ';')
+
+    return '\n'.join(lines) + '\n}\n'
 
 
 def generate_and_save(source: str, destination: str) -> None:
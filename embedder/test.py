@@ -1,9 +1,11 @@
 import unittest
 from os.path import isfile
 try:
-    from embedder import read_woff_properties, generate_css
+    from embedder import (read_woff_properties, read_woff_properties_from_bytes,
+                          generate_css, generate_css_from_bytes)
 except ImportError:
-    from .embedder import read_woff_properties, generate_css
+    from .embedder import (read_woff_properties, read_woff_properties_from_bytes,
+                           generate_css, generate_css_from_bytes)
 from hashlib import sha1
 
 test_filepath = 'embedder/roboto.woff'
@@ -18,15 +20,16 @@ class EmbedderTest(unittest.TestCase):
     def test_woff_properties(self):
         properties = read_woff_properties(test_filepath)
         # if the properties worked right, this should be the SHA1 hash:
-        #   fb7ccc62f67c99f18d2d5bbf4592bf8329b2b4fa
+        #   5c91bcb18799fa843b92f19165fd3fce9f73b3ea
         # but we can check a few specifics just in case
         self.assertEqual(properties['name']['Full'], 'Roboto')
         self.assertEqual(properties['name']['PostScript'], 'Roboto-Regular')
         self.assertEqual(properties['os/2']['version'], 3)
-        self.assertEqual(properties['os/2']['panose'][0], 2)
-        self.assertEqual(properties['os/2']['ulUnicodeRange1'], 2147483687)
+        self.assertEqual(properties['os/2']['usWeightClass'], 400)
+        self.assertEqual(properties['os/2']['usWidthClass'], 5)
+        self.assertEqual(properties['os/2']['fsType'], 0)
         self.assertEqual(
-            'fb7ccc62f67c99f18d2d5bbf4592bf8329b2b4fa',
+            '5c91bcb18799fa843b92f19165fd3fce9f73b3ea',
             get_hash(str(properties)))
 
     def test_css(self):
@@ -35,6 +38,18 @@ class EmbedderTest(unittest.TestCase):
             'ce154191418e5b6c8ea99467fb156ae429c76f0c',
             get_hash(css))
 
+    def test_from_bytes(self):
+        # the in-memory entry points should agree exactly with their
+        # path-based counterparts
+        with open(test_filepath, 'rb') as file:
+            buf = file.read()
+        self.assertEqual(
+            read_woff_properties_from_bytes(buf),
+            read_woff_properties(test_filepath))
+        self.assertEqual(
+            generate_css_from_bytes(buf),
+            generate_css(test_filepath))
+
 
 if __name__ == '__main__':
     if not isfile(test_filepath):